@@ -1,6 +1,28 @@
+import hashlib
+import json
+import os
+import time
+
+# orjson parses BLS-sized payloads ~2-3x faster than stdlib json; fall
+# back to the stdlib when it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 import requests
+import numpy as np
 import pandas as pd
+
+# When running headless (CI/cron writing PNGs), select the faster
+# non-interactive Agg backend. Must happen before pyplot is imported.
+import matplotlib
+if os.environ.get("JOBS_DAY_HEADLESS") == "1":
+    matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.dates import YearLocator, DateFormatter
 from datetime import datetime
 
 ### Config ###
@@ -20,54 +42,148 @@ end_year = datetime.now().year
 # Set API key
 api_key = "b3050e233e2649068a3328d1ccbf7aaa"
 
+# On-disk cache for BLS responses, so repeated runs during a session
+# skip the network entirely
+cache_dir = os.path.expanduser("~/.cache/jobs_day")
+cache_expire_seconds = 3600  # Re-fetch from BLS after one hour
+
+# Shared session with a small connection pool, so multiple requests in
+# one run (e.g. batching over many series) reuse the same TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.headers["Content-Type"] = "application/json"
+
 # Function to get BLS data.
 def get_bls_data(series_ids, start_year, end_year):
-    """Fetch data from BLS API for specified series and date range"""
+    """Fetch data from BLS API for specified series and date range.
+
+    Responses are cached on disk (keyed by series and date range) and
+    reused for up to cache_expire_seconds, so only the first call of a
+    session actually hits the network.
+    """
+    # Cache key covers everything that changes the response
+    key = hashlib.sha256(
+        json.dumps([list(series_ids), start_year, end_year]).encode()
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+
+    # Serve from cache if a fresh copy exists
+    if os.path.exists(cache_path):
+        if time.time() - os.path.getmtime(cache_path) < cache_expire_seconds:
+            with open(cache_path, "rb") as f:
+                return _json_loads(f.read())
+
     url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
-    
+
     payload = {
         "seriesid": series_ids,
         "startyear": start_year,
         "endyear": end_year,
-        "registrationkey": api_key
+        "registrationkey": api_key,
+        # Skip metadata we never read, shrinking the response JSON
+        "catalog": False,
+        "calculations": False,
+        "annualaverage": False
     }
-    
-    response = requests.post(url, json=payload)
-    return response.json()
+
+    response = _SESSION.post(url, json=payload, timeout=(3.05, 30))
+    response.raise_for_status()
+    # Decode straight from the response bytes rather than response.json()
+    raw_data = _json_loads(response.content)
+
+    # Save for subsequent runs -- but only successful responses. BLS
+    # reports failures (rate limits, bad series) with HTTP 200 and a
+    # "REQUEST_NOT_PROCESSED" status; caching those would replay the
+    # error offline for the next hour instead of retrying
+    if raw_data.get("status") == "REQUEST_SUCCEEDED":
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(raw_data, f)
+
+    return raw_data
+
+# Date-conversion kernel: year/month pairs -> months since the 1970
+# epoch, which views directly as datetime64[M]. JIT-compiled with Numba
+# when available (cache=True so compilation is paid once, not per run);
+# falls back to vectorized NumPy otherwise.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _months_since_epoch(years, months):
+        out = np.empty(years.size, np.int64)
+        for i in range(years.size):
+            out[i] = (years[i] - 1970) * 12 + (months[i] - 1)
+        return out
+else:
+    def _months_since_epoch(years, months):
+        return (years.astype(np.int64) - 1970) * 12 + (months.astype(np.int64) - 1)
 
 # Function to process BLS data and push into Pandas dataframe.
 def process_bls_data(raw_data):
     """Convert BLS API response to pandas DataFrame"""
-    data_points = []
-    
+    columns = []
+
     for series in raw_data["Results"]["series"]:
         series_id = series["seriesID"]
-        
-        for item in series["data"]:
-            year = int(item["year"])
-            period = item["period"]
-            
-            # Convert period (e.g., M01) to month number
-            if period.startswith("M"):
-                month = int(period[1:])
-                date = f"{year}-{month:02d}-01"  # Format as YYYY-MM-DD
-                
-                data_points.append({
-                    "series_id": series_id,
-                    "date": date,
-                    "value": float(item["value"])
-                })
-    
-    # Create DataFrame and convert date to datetime
-    df = pd.DataFrame(data_points)
-    df["date"] = pd.to_datetime(df["date"])
-    
-    # Pivot to wide format with series as columns
-    pivot_df = df.pivot(index="date", columns="series_id", values="value")
-    
-    return pivot_df
 
-def plot_time_series(df, title="BLS Data", subtitle=None, logo_path=None, 
+        # Keep monthly observations only (periods M01-M12; M13 is the
+        # annual average, not a month). Direct indexing avoids a method
+        # call and substring per data point
+        raw = [d for d in series["data"] if d["period"][0] == "M" and d["period"] != "M13"]
+        n = len(raw)
+
+        # The observation count is known up front, so preallocate the
+        # field arrays and fill them in one pass over the data -- no
+        # per-point dicts, no list growth, and each dict is touched once.
+        # The period is always "Mxx", so the month falls out of two digit
+        # ords with no substring allocation. float32 is plenty for BLS
+        # values reported to one decimal place and halves the frame's
+        # memory footprint
+        years = np.empty(n, dtype=np.int16)
+        months = np.empty(n, dtype=np.int8)
+        values = np.empty(n, dtype=np.float32)
+        for i, d in enumerate(raw):
+            period = d["period"]
+            years[i] = int(d["year"])
+            months[i] = (ord(period[1]) - 48) * 10 + (ord(period[2]) - 48)
+            values[i] = float(d["value"])
+
+        # Convert year/month pairs to datetime64 with pure integer
+        # arithmetic, skipping pandas' datetime assembly path
+        dates = pd.DatetimeIndex(_months_since_epoch(years, months).view("datetime64[M]"))
+
+        columns.append(pd.Series(values, index=dates, name=series_id))
+
+    # The response is already grouped per series, so assemble the wide
+    # frame directly -- no long-format intermediate, no pivot
+    wide_df = pd.concat(columns, axis=1, join="outer").sort_index()
+    wide_df.index.name = "date"
+    wide_df.columns.name = "series_id"
+
+    return wide_df
+
+# Style settings that don't depend on plot_time_series arguments,
+# defined once instead of being rebuilt per call
+_BASE_STYLE = {
+    'font.family': 'sans-serif'
+}
+
+# NBER recession dates, one (start, end) row each, parsed to datetime64
+# once at import rather than on every plot
+_RECESSIONS = np.array([
+    # Historical recessions
+    ('2001-03-01', '2001-11-01'),
+    ('2007-12-01', '2009-06-01'),
+    # COVID-19 recession
+    ('2020-02-01', '2020-04-01')
+    # Add future recessions as needed
+], dtype='datetime64[D]')
+
+def plot_time_series(df, title="BLS Data", subtitle=None, logo_path=None,
                  line_color='#8B5CF6', grid_color='#E5E7EB', 
                  recession_color='#DBEAFE', text_color='#374151',
                  title_font={'size': 24, 'weight': 'bold'}, 
@@ -106,132 +222,150 @@ def plot_time_series(df, title="BLS Data", subtitle=None, logo_path=None,
     x_padding : float
         Fraction of the x-axis range to add as padding (default: 0.02 or 2%)
     """
-    # Set custom style parameters
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['axes.edgecolor'] = grid_color
-    plt.rcParams['axes.labelcolor'] = text_color
-    plt.rcParams['xtick.color'] = text_color
-    plt.rcParams['ytick.color'] = text_color
-    
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 7))
-    
-    # Get the data date range
-    start_date = df.index.min()
-    end_date = df.index.max()
-    date_range = end_date - start_date
-    padding = pd.Timedelta(days=date_range.days * x_padding)
-    
-    # Set x-axis limits based on data
-    x_min = start_date - padding
-    x_max = end_date + padding
-    ax.set_xlim(x_min, x_max)
-    
-    # Add recession shading if requested
-    if add_recession_shading:
-        # NBER recession dates (start and end dates as YYYY-MM-DD)
-        recession_dates = [
-            # Historical recessions
-            ('2001-03-01', '2001-11-01'),
-            ('2007-12-01', '2009-06-01'),
-            # COVID-19 recession
-            ('2020-02-01', '2020-04-01')
-            # Add future recessions as needed
-        ]
-        
-        # Add shaded regions for recessions that overlap with the data
-        for start_date_str, end_date_str in recession_dates:
-            rec_start = pd.to_datetime(start_date_str)
-            rec_end = pd.to_datetime(end_date_str)
-            
-            # Only draw recessions that overlap with the data's time range
-            if not (rec_end < x_min or rec_start > x_max):
-                # Clip recession to the data range
-                visible_start = max(rec_start, x_min)
-                visible_end = min(rec_end, x_max)
-                
-                ax.axvspan(visible_start, visible_end, 
-                          color=recession_color, alpha=0.5, zorder=1)
-    
-    # Plot data for each column
-    for column in df.columns:
-        series_name = series_names.get(column, column)
-        ax.plot(df.index, df[column], color=line_color, linewidth=2.5, zorder=3, label=series_name)
-        
-        # Add current value annotation if requested
-        if show_current_value:
-            current_value = df[column].iloc[-1]
-            
-            # Add horizontal line at current value
-            ax.axhline(current_value, color=line_color, linestyle='--', alpha=0.5, zorder=2)
-            
-            # Add text for current value - position at end of plot with padding
-            text_x_pos = end_date + padding * 0.8  # Position at 80% of the padding
-            ax.text(text_x_pos, current_value, f'{current_value:.1f}%', 
-                    color=line_color, fontweight='bold', va='center', zorder=4)
-    
-    # Set title and subtitle
-    ax.set_title(title, fontsize=title_font['size'], fontweight=title_font['weight'], 
-                color=text_color, pad=20)
-    
-    if subtitle:
-        ax.text(0.5, 0.98, subtitle, transform=ax.transAxes, ha='center',
-                fontsize=subtitle_font['size'], fontweight=subtitle_font['weight'],
-                color=subtitle_font['color'])
-    
-    # Format axes
-    ax.set_xlabel('', fontsize=12)  # Empty x-label since we have years on x-axis
-    ax.set_ylabel('Unemployment Rate (u-%)', fontsize=12)
-    
-    # Set y-axis limits
-    y_max = max(df.max().max() * 1.1, 15)  # Set max to either data max * 1.1 or 15%, whichever is higher
-    ax.set_ylim(0, y_max)
-    
-    # Format x-axis to show years
-    from matplotlib.dates import YearLocator, DateFormatter
-    ax.xaxis.set_major_locator(YearLocator(4))  # Show every 4 years
-    ax.xaxis.set_major_formatter(DateFormatter('%Y'))
-    
-    # Format grid
-    ax.grid(True, color=grid_color, linestyle='-', linewidth=0.7, alpha=0.7)
-    ax.set_axisbelow(True)  # Place grid below data
-    
-    # Format ticks
-    ax.tick_params(axis='both', which='major', labelsize=10)
-    
-    # Add source citation
-    ax.text(0.01, 0.02, 'Source: Bureau of Labor Statistics,\nCurrent Population Survey', 
-            transform=ax.transAxes, fontsize=10, color='#6B7280')
-    
-    # Add logo if path is provided
-    if logo_path:
-        try:
-            logo_img = plt.imread(logo_path)
-            logo_ax = fig.add_axes([0.85, 0.02, 0.1, 0.1], anchor='SE', zorder=10)
-            logo_ax.imshow(logo_img)
-            logo_ax.axis('off')
-        except Exception as e:
-            print(f"Could not load logo image: {e}")
-    
-    # Adjust layout
-    plt.tight_layout()
-    
+    # Scope the style to this plot with rc_context instead of mutating
+    # global rcParams (and invalidating matplotlib's caches) on every call
+    style = dict(_BASE_STYLE)
+    style.update({
+        'axes.edgecolor': grid_color,
+        'axes.labelcolor': text_color,
+        'xtick.color': text_color,
+        'ytick.color': text_color
+    })
+
+    with plt.rc_context(style):
+        # Create figure and axis
+        fig, ax = plt.subplots(figsize=(12, 7))
+        ax.xaxis_date()  # Treat x values as dates for tick locating/formatting
+
+        # Get the data date range. process_bls_data returns a sorted
+        # index, so the endpoints are O(1) lookups; sort here only if a
+        # caller hands us something unordered
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        start_date = df.index[0]
+        end_date = df.index[-1]
+        date_range = end_date - start_date
+        # np.timedelta64 skips the pd.Timedelta construction/validation
+        # chain; Timestamp arithmetic accepts it directly
+        padding = np.timedelta64(int(date_range.days * x_padding), "D")
+
+        # Set x-axis limits based on data
+        x_min = start_date - padding
+        x_max = end_date + padding
+        ax.set_xlim(x_min, x_max)
+
+        # Compute the y-axis ceiling up front; the recession shading below
+        # needs it for the bar height. One nanmax pass over the raw buffer
+        # instead of the column-wise max().max() double reduction; nanmax
+        # also copes with BLS's occasional missing months
+        y_max = max(float(np.nanmax(df.to_numpy())) * 1.1, 15.0)  # Data max * 1.1 or 15%, whichever is higher
+
+        # Add recession shading if requested
+        if add_recession_shading:
+            # Clip all recessions to the visible range in one shot; ones
+            # entirely outside collapse to zero width and drop out
+            lo = x_min.to_datetime64()
+            hi = x_max.to_datetime64()
+            starts = np.clip(_RECESSIONS[:, 0], lo, hi)
+            ends = np.clip(_RECESSIONS[:, 1], lo, hi)
+            mask = ends > starts
+
+            # Draw all visible recessions as a single artist instead of
+            # one axvspan (one Polygon) per recession
+            if mask.any():
+                starts_num = mdates.date2num(starts[mask])
+                widths = mdates.date2num(ends[mask]) - starts_num
+                ax.broken_barh(list(zip(starts_num, widths)), (0, y_max),
+                               color=recession_color, alpha=0.5, zorder=1)
+
+        # Convert the datetime index to matplotlib ordinals once, outside
+        # the column loop, so each plot call skips the per-call datetime
+        # unit conversion
+        x_nums = mdates.date2num(df.index.values)
+
+        # Plot data for each column
+        for column in df.columns:
+            series_name = series_names.get(column, column)
+            ax.plot(x_nums, df[column].to_numpy(copy=False), color=line_color, linewidth=2.5, zorder=3, label=series_name)
+
+            # Add current value annotation if requested
+            if show_current_value:
+                current_value = df[column].iloc[-1]
+
+                # Add horizontal line at current value
+                ax.axhline(current_value, color=line_color, linestyle='--', alpha=0.5, zorder=2)
+
+                # Add text for current value - position at end of plot with padding
+                text_x_pos = end_date + padding * 0.8  # Position at 80% of the padding
+                ax.text(text_x_pos, current_value, f'{current_value:.1f}%',
+                        color=line_color, fontweight='bold', va='center', zorder=4)
+
+        # Set title and subtitle
+        ax.set_title(title, fontsize=title_font['size'], fontweight=title_font['weight'],
+                    color=text_color, pad=20)
+
+        if subtitle:
+            ax.text(0.5, 0.98, subtitle, transform=ax.transAxes, ha='center',
+                    fontsize=subtitle_font['size'], fontweight=subtitle_font['weight'],
+                    color=subtitle_font['color'])
+
+        # Format axes
+        ax.set_xlabel('', fontsize=12)  # Empty x-label since we have years on x-axis
+        ax.set_ylabel('Unemployment Rate (u-%)', fontsize=12)
+
+        # Set y-axis limits
+        ax.set_ylim(0, y_max)
+
+        # Format x-axis to show years
+        ax.xaxis.set_major_locator(YearLocator(4))  # Show every 4 years
+        ax.xaxis.set_major_formatter(DateFormatter('%Y'))
+
+        # Format grid
+        ax.grid(True, color=grid_color, linestyle='-', linewidth=0.7, alpha=0.7)
+        ax.set_axisbelow(True)  # Place grid below data
+
+        # Format ticks
+        ax.tick_params(axis='both', which='major', labelsize=10)
+
+        # Add source citation
+        ax.text(0.01, 0.02, 'Source: Bureau of Labor Statistics,\nCurrent Population Survey',
+                transform=ax.transAxes, fontsize=10, color='#6B7280')
+
+        # Add logo if path is provided
+        if logo_path:
+            try:
+                logo_img = plt.imread(logo_path)
+                logo_ax = fig.add_axes([0.85, 0.02, 0.1, 0.1], anchor='SE', zorder=10)
+                logo_ax.imshow(logo_img)
+                logo_ax.axis('off')
+            except Exception as e:
+                print(f"Could not load logo image: {e}")
+
+        # Adjust layout
+        plt.tight_layout()
+
     return fig, ax
     
-# Get data from BLS API
-raw_data = get_bls_data(series_ids, start_year, end_year)
-    
-# Process into DataFrame
-df = process_bls_data(raw_data)
-    
-# Plot the data
-# Advanced usage with customization
-fig, ax = plot_time_series(
-    df, 
-    title="Unemployment still low in March",
-    subtitle="Unemployment has hovered between 4.0-4.2% since May 2024",
-    #logo_path="company_logo.png",  # Add your logo path here
-    line_color="#ff7f0e",  # Purple line color
-    recession_color="#DBEAFE"  # Light blue recession shading
-)
-plt.show()
+if __name__ == "__main__":
+    # Get data from BLS API
+    raw_data = get_bls_data(series_ids, start_year, end_year)
+
+    # Process into DataFrame
+    df = process_bls_data(raw_data)
+
+    # Plot the data
+    # Advanced usage with customization
+    fig, ax = plot_time_series(
+        df,
+        title="Unemployment still low in March",
+        subtitle="Unemployment has hovered between 4.0-4.2% since May 2024",
+        #logo_path="company_logo.png",  # Add your logo path here
+        line_color="#ff7f0e",  # Purple line color
+        recession_color="#DBEAFE"  # Light blue recession shading
+    )
+
+    # Headless runs save straight to file; interactive runs open a window
+    if os.environ.get("JOBS_DAY_HEADLESS") == "1":
+        fig.savefig("jobs_day.png", dpi=150)
+    else:
+        plt.show()